@@ -1,11 +1,18 @@
-from fastapi import FastAPI, Query, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import FastAPI, Query, HTTPException, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
-from typing import Optional, List, Dict, Any
-from urllib.parse import quote, unquote
+from typing import Optional, List, Dict, Tuple, Any, AsyncIterator, Awaitable, Callable
+from urllib.parse import quote, unquote, urlencode, urlsplit
+from contextlib import AsyncExitStack, asynccontextmanager
 import asyncio
-from playwright.async_api import async_playwright
+import json
+import math
+import os
 import re
+import httpx
+from cachetools import TTLCache
+from playwright.async_api import async_playwright
+from selectolax.lexbor import LexborHTMLParser
 from datetime import datetime
 import logging
 
@@ -13,7 +20,177 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title="Tayara Scraper API", version="1.0.0")
+# Browser context options shared by every pooled context
+CONTEXT_OPTIONS = {
+    # Use a complete Chrome user agent matching the Chromium engine
+    'user_agent': 'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    # Set viewport
+    'viewport': {'width': 1920, 'height': 1080},
+    # Set additional context options
+    'locale': 'fr-FR',
+    'timezone_id': 'Africa/Tunis',
+    # Ignore HTTPS errors if any
+    'ignore_https_errors': True,
+}
+
+# Chromium flags that cut child-process fan-out and memory use
+BROWSER_ARGS = [
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--disable-features=site-per-process",
+]
+
+# Global cap on concurrent scrapes, requests wait at most SCRAPE_QUEUE_TIMEOUT for a slot.
+# Callers always take a slot before checking out a pooled browser context.
+SCRAPE_CONCURRENCY = int(os.getenv("SCRAPE_CONCURRENCY", "4"))
+SCRAPE_QUEUE_TIMEOUT = float(os.getenv("SCRAPE_QUEUE_TIMEOUT", "10"))
+_SEM = asyncio.Semaphore(SCRAPE_CONCURRENCY)
+
+class ScraperBusyError(Exception):
+    """Raised when no scrape slot frees up before the queue deadline"""
+
+def _abandon(task: asyncio.Future, undo: Callable[[Any], Any]):
+    """
+    Let a pending acquisition finish in the background and hand its result straight back.
+    It is not cancelled: a cancelled task can still have taken the resource.
+    """
+    task.add_done_callback(lambda t: undo(t.result()) if not t.cancelled() and t.exception() is None else None)
+
+async def acquire_or_busy(aw: Awaitable[Any], undo: Callable[[Any], Any], message: str) -> Any:
+    """
+    Await an acquisition for at most SCRAPE_QUEUE_TIMEOUT, raising ScraperBusyError on timeout.
+    Unlike asyncio.wait_for, a resource acquired after we time out or get
+    cancelled is handed back through `undo` instead of being leaked.
+    """
+    task = asyncio.ensure_future(aw)
+    try:
+        done, _ = await asyncio.wait({task}, timeout=SCRAPE_QUEUE_TIMEOUT)
+    except BaseException:
+        _abandon(task, undo)
+        raise
+    if not done:
+        _abandon(task, undo)
+        raise ScraperBusyError(message)
+    return task.result()
+
+@asynccontextmanager
+async def scrape_slot():
+    """Hold one of the global scrape slots"""
+    await acquire_or_busy(_SEM.acquire(), lambda _: _SEM.release(), "Too many concurrent scrapes, try again later")
+    try:
+        yield
+    finally:
+        _SEM.release()
+
+# Resources the scraper never parses, blocked to save bandwidth
+BLOCKED_RESOURCE_TYPES = {"image", "media", "font", "stylesheet"}
+BLOCKED_HOST_PARTS = ("analytics", "googletagmanager")
+
+async def block_unneeded_resources(route):
+    """Abort requests for assets and trackers, let everything else through"""
+    request = route.request
+    # Never block navigations, a search or product slug may contain a tracker name
+    if request.resource_type != "document" and (
+        request.resource_type in BLOCKED_RESOURCE_TYPES
+        or any(part in (urlsplit(request.url).hostname or "") for part in BLOCKED_HOST_PARTS)
+    ):
+        await route.abort()
+    else:
+        await route.continue_()
+
+# True once the HTML has been fully parsed; goto(wait_until='commit') returns
+# while the document is still streaming in
+DOCUMENT_PARSED_JS = "document.readyState !== 'loading'"
+
+# Selectors of the listing page article cards, shared by the browser and selectolax paths
+SEL_ARTICLE = 'article'
+SEL_TITLE = 'h2.card-title'
+SEL_PRICE = 'data'
+SEL_LOC = 'svg[viewBox="0 0 20 20"] + span'
+SEL_IMG = 'img'
+SEL_LINK = 'a'
+
+# Listing header holding the total ad count, e.g. "1 234 annonces"
+SEL_TOTAL_COUNT = 'h1'
+_TOTAL_COUNT_RE = re.compile(r'(?<!\d)(\d+(?:[\s.]\d{3})*)\s*(?:annonces?|résultats?)', re.IGNORECASE)
+
+LISTING_SELECTORS = {
+    'article': SEL_ARTICLE,
+    'title': SEL_TITLE,
+    'price': SEL_PRICE,
+    'loc': SEL_LOC,
+    'img': SEL_IMG,
+    'link': SEL_LINK,
+    'total': SEL_TOTAL_COUNT,
+}
+
+# Collects every article card of a listing page, plus the total ad count text,
+# in one page.evaluate call.
+# Text is read with textContent: innerText depends on the blocked stylesheets.
+EXTRACT_PRODUCTS_JS = """(sel) => ({
+    articles: Array.from(document.querySelectorAll(sel.article)).map(a => ({
+        title: a.querySelector(sel.title)?.textContent,
+        priceVal: a.querySelector(sel.price)?.getAttribute('value'),
+        priceTxt: a.querySelector(sel.price)?.textContent,
+        loc: a.querySelector(sel.loc)?.textContent,
+        img: a.querySelector(sel.img)?.getAttribute('src'),
+        href: a.querySelector(sel.link)?.getAttribute('href'),
+    })),
+    totalText: document.querySelector(sel.total)?.textContent,
+})"""
+
+# Selectors of the product detail page fields
+PRODUCT_PAGE_SELECTORS = {
+    'title': 'li.p-2.my-1.text-xs.text-gray-600 span',
+    'sellerName': 'span.text-sm.font-semibold.text-gray-700.capitalize',
+    'price': 'data',
+    'description': 'p.text-sm.text-start.text-gray-700',
+    'location': 'div.flex.items-center.space-x-2.mb-1 span',
+    'deliveryContainer': 'span.flex.flex-col.py-1',
+    'deliveryStatus': 'span:nth-child(2)',
+}
+
+# Selectors of the seller phone number reveal flow
+SEL_PHONE_BUTTON = 'button[aria-label="Afficher numéro"]'
+SEL_PHONE_LINK = 'a[href^="tel:"]'
+
+
+# Collects every field of a product detail page in one page.evaluate call
+EXTRACT_PRODUCT_PAGE_JS = """(sel) => {
+    const q = (s) => document.querySelector(s);
+    return {
+        title: q(sel.title)?.textContent,
+        sellerName: q(sel.sellerName)?.textContent,
+        priceVal: q(sel.price)?.getAttribute('value'),
+        priceTxt: q(sel.price)?.textContent,
+        description: q(sel.description)?.textContent,
+        location: q(sel.location)?.textContent,
+        isDelivery: q(sel.deliveryContainer)?.querySelector(sel.deliveryStatus)?.textContent,
+    };
+}"""
+
+# Headers sent by the HTTP client, matching the browser contexts
+UA_HEADERS = {
+    'User-Agent': CONTEXT_OPTIONS['user_agent'],
+    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+    'Accept-Language': 'fr-FR,fr;q=0.9',
+}
+
+# In-process caches of successful responses, keyed by normalized URL
+CACHE_TTL = 300  # seconds
+CACHE_CONTROL = f"public, max-age={CACHE_TTL}"
+_SEARCH_CACHE = TTLCache(maxsize=1024, ttl=CACHE_TTL)
+_PRODUCT_CACHE = TTLCache(maxsize=1024, ttl=CACHE_TTL)
+
+# Streamed responses must reach the client event by event, not be cached or
+# buffered by a reverse proxy (X-Accel-Buffering is honoured by nginx)
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+# Seller phone numbers rarely change, keep them for hours, keyed by product URL
+CONTACT_CACHE_TTL = 3 * 3600  # seconds
+_CONTACT_CACHE = TTLCache(maxsize=10_000, ttl=CONTACT_CACHE_TTL)
 
 # Response Models
 class Product(BaseModel):
@@ -32,6 +209,7 @@ class SearchResponse(BaseModel):
     success: bool
     total_products: int
     products: List[Product]
+    failed_pages: int = 0
     error: Optional[str] = None
 
 class ProductResponse(BaseModel):
@@ -39,11 +217,103 @@ class ProductResponse(BaseModel):
     product: Product
     error: Optional[str] = None
 
+class ContextPool:
+    """Queue-backed pool of pre-warmed Playwright browser contexts"""
+    
+    def __init__(self, browser, size: int = 4, max_uses: int = 50):
+        self.browser = browser
+        self.size = size
+        # Recycle a context after this many pages to bound memory
+        self.max_uses = max_uses
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._uses: Dict[Any, int] = {}
+        # Contexts that could not be recreated on recycle, refilled on checkout
+        self._missing = 0
+    
+    async def _new_context(self):
+        context = await self.browser.new_context(**CONTEXT_OPTIONS)
+        # Set longer timeout for page operations
+        context.set_default_timeout(60000)  # 60 seconds
+        # Skip images, fonts, media and analytics
+        await context.route('**/*', block_unneeded_resources)
+        self._uses[context] = 0
+        return context
+    
+    async def start(self):
+        """Pre-warm the pool with `size` contexts"""
+        for _ in range(self.size):
+            self._queue.put_nowait(await self._new_context())
+    
+    async def _release(self, context):
+        self._uses[context] += 1
+        if self._uses[context] >= self.max_uses:
+            del self._uses[context]
+            try:
+                await context.close()
+            except Exception as e:
+                logger.warning(f"Error closing browser context: {e}")
+            try:
+                context = await self._new_context()
+            except Exception as e:
+                # Leave the slot empty rather than fail the caller, _refill retries it
+                logger.error(f"Error recreating browser context: {e}")
+                self._missing += 1
+                return
+        self._queue.put_nowait(context)
+    
+    async def _refill(self):
+        """Replace contexts that failed to be recreated on recycle"""
+        while self._missing:
+            self._missing -= 1
+            try:
+                self._queue.put_nowait(await self._new_context())
+            except Exception as e:
+                logger.error(f"Error recreating browser context: {e}")
+                self._missing += 1
+                return
+    
+    @asynccontextmanager
+    async def page(self):
+        """Check out a context and yield a fresh page from it"""
+        await self._refill()
+        context = await acquire_or_busy(self._queue.get(), self._queue.put_nowait, "No browser context available, try again later")
+        page = None
+        try:
+            page = await context.new_page()
+            yield page
+        finally:
+            try:
+                if page is not None:
+                    await page.close()
+            finally:
+                # Shielded so a caller cancelled mid-cleanup still returns the context
+                await asyncio.shield(self._release(context))
+    
+    async def close(self):
+        while not self._queue.empty():
+            try:
+                await self._queue.get_nowait().close()
+            except Exception as e:
+                logger.warning(f"Error closing browser context: {e}")
+        self._uses.clear()
+        self._missing = 0
+
 class TayaraScraper:
     """Scraper class for Tayara.tn using Playwright"""
     
     BASE_URL = "https://www.tayara.tn/ads"
     
+    # Maximum number of result pages scraped at the same time
+    PAGE_CONCURRENCY = 4
+    
+    # Number of ads Tayara shows on a full result page
+    PAGE_SIZE = 30
+    
+    def __init__(self):
+        # Set on application startup
+        self.pool: Optional[ContextPool] = None
+        self.http_client: Optional[httpx.AsyncClient] = None
+    
     @staticmethod
     def build_url(
         query: str,
@@ -57,111 +327,115 @@ class TayaraScraper:
     ) -> str:
         """Build Tayara URL from parameters"""
         
-        # Build path segments
+        # Build path segments: category, subcategory, location, condition, query
         path_segments = []
+        for prefix, value in (("c", category), (None, subcategory), ("l", city), ("t", condition), ("k", query)):
+            if value:
+                path_segments.append(f"{prefix}/{quote(value)}" if prefix else quote(value))
         
-        # Add category
-        if category:
-            path_segments.append(f"c/{quote(category)}")
+        # Build query parameters
+        params = urlencode({
+            key: value
+            for key, value in (("minPrice", min_price), ("maxPrice", max_price), ("page", page or None))
+            if value is not None
+        })
         
-        # Add subcategory
-        if subcategory:
-            path_segments.append(quote(subcategory))
+        url = f"{TayaraScraper.BASE_URL}/{'/'.join(path_segments)}/"
+        return f"{url}?{params}" if params else url
+    
+    async def scrape_products_per_page(
+        self,
+        url: str,
+        get_page: Optional[Callable[[], Awaitable[Any]]] = None
+    ) -> Tuple[List[Product], Optional[int]]:
+        """
+        Scrape one listing page, returning its products and the total ad count if shown.
+        The caller must hold a scrape slot (see scrape_slot).
+        """
         
-        # Add location
-        if city:
-            path_segments.append(f"l/{quote(city)}")
+        logger.info(f"Scraping URL: {url}")
         
-        # Add condition
-        if condition:
-            path_segments.append(f"t/{quote(condition)}")
-
-        # Add query
-        if query:
-            path_segments.append(f"k/{quote(query)}")
+        # Try plain HTTP + HTML parsing first, the article cards are server-rendered
+        try:
+            products, total = await self.scrape_products_per_page_fast(url)
+        except Exception as e:
+            logger.warning(f"Fast path failed for {url}: {e}")
+            products, total = [], None
         
-        # Build base URL
-        url = f"{TayaraScraper.BASE_URL}/{'/'.join(path_segments)}/"
+        if products:
+            logger.info(f"Extracted {len(products)} products from page (fast path)")
+            return products, total
         
-        # Add query parameters
-        params = []
-        if min_price is not None:
-            params.append(f"minPrice={min_price}")
-        if max_price is not None:
-            params.append(f"maxPrice={max_price}")
-        if page:
-            params.append(f"page={page}")
-            
-        if params:
-            url += "?" + "&".join(params)
+        # Fall back to the browser when no articles were found in the raw HTML
+        logger.info(f"No articles in raw HTML, falling back to browser for {url}")
+        if get_page is not None:
+            # Reuse the caller's page so navigation keeps a warm connection
+            return await self._scrape_with_page(await get_page(), url)
+        return await self.scrape_products_per_page_browser(url)
+    
+    async def scrape_products_per_page_fast(self, url: str) -> Tuple[List[Product], Optional[int]]:
+        """Scrape a listing page with httpx and selectolax, without a browser"""
+        
+        response = await self.http_client.get(url)
+        response.raise_for_status()
         
-        return url
+        tree = LexborHTMLParser(response.text)
+        
+        products = []
+        for node in tree.css(SEL_ARTICLE):
+            product_data = self.parse_product_node(node)
+            if product_data:
+                products.append(product_data)
+        
+        total_elem = tree.css_first(SEL_TOTAL_COUNT)
+        total = self.extract_page_meta(total_elem.text() if total_elem else None)
+        
+        return products, total
     
-    async def scrape_products_per_page(self, url: str):
-        logger.info(f"Scraping URL: {url}")
+    async def scrape_products_per_page_browser(self, url: str) -> Tuple[List[Product], Optional[int]]:
+        """Scrape a listing page by rendering it in a pooled browser context"""
+        
+        async with self.pool.page() as page_obj:
+            return await self._scrape_with_page(page_obj, url)
+    
+    async def _scrape_with_page(self, page_obj, url: str) -> Tuple[List[Product], Optional[int]]:
+        """Navigate an already open page to a listing URL and extract its products"""
         
         products = []
         
-        async with async_playwright() as p:
-            # Launch Firefox browser
-            browser = await p.firefox.launch(
-                headless=True,
+        try:
+            # Set additional page timeouts
+            page_obj.set_default_navigation_timeout(60000)
+            page_obj.set_default_timeout(30000)
+            
+            # Navigate to the URL, returning as soon as the response arrives
+            await page_obj.goto(
+                url, 
+                wait_until='commit',
+                timeout=60000
             )
             
-            try:
-                context = await browser.new_context(
-                    # Use a more complete Firefox user agent
-                    user_agent='Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0',
-                    # Set viewport
-                    viewport={'width': 1920, 'height': 1080},
-                    # Set additional context options
-                    locale='fr-FR',
-                    timezone_id='Africa/Tunis',
-                    # Ignore HTTPS errors if any
-                    ignore_https_errors=True
-                )
-                
-                # Set longer timeout for page operations
-                context.set_default_timeout(60000)  # 60 seconds
-                
-                page_obj = await context.new_page()
-                
-                # Set additional page timeouts
-                page_obj.set_default_navigation_timeout(60000)
-                page_obj.set_default_timeout(30000)
-                
-                # Navigate to the URL with more robust options
-                await page_obj.goto(
-                    url, 
-                    wait_until='domcontentloaded',
-                    timeout=60000
-                )
-                
-                # Wait for products to load - using the actual article selector
-                await page_obj.wait_for_selector('article', timeout=10000)
-                
-                # Extract products - targeting the actual article elements
-                product_elements = await page_obj.query_selector_all('article')
+            # Wait for products to load, then for the whole document to be parsed
+            # so the evaluate below sees every card rather than just the first
+            await page_obj.wait_for_selector(SEL_ARTICLE, timeout=10000)
+            await page_obj.wait_for_function(DOCUMENT_PARSED_JS, timeout=10000)
+            
+            # Extract all article records in a single round-trip
+            raw_page = await page_obj.evaluate(EXTRACT_PRODUCTS_JS, LISTING_SELECTORS)
 
-                for element in product_elements:
-                    try:
-                        product_data = await self.extract_product_info(element)
-                        if product_data:
-                            products.append(product_data)
-                    except Exception as e:
-                        logger.error(f"Error extracting product: {e}")
-                        continue
-                
-                logger.info(f"Extracted {len(products)} products from page")
-                return products
-                
-            except Exception as e:
-                logger.error(f"Scraping error: {e}")
-                raise ValueError(f"Scraping failed: {str(e)} for page url {url}")
-            finally:
-                await browser.close()
+            for raw in raw_page['articles']:
+                product_data = self.extract_product_info(raw)
+                if product_data:
+                    products.append(product_data)
+            
+            logger.info(f"Extracted {len(products)} products from page")
+            return products, self.extract_page_meta(raw_page.get('totalText'))
+            
+        except Exception as e:
+            logger.error(f"Scraping error: {e}")
+            raise ValueError(f"Scraping failed: {str(e)} for page url {url}")
     
-    async def scrape_products(
+    async def iter_product_pages(
         self,
         query: str,
         category: str,
@@ -170,106 +444,191 @@ class TayaraScraper:
         condition: Optional[str] = None,
         min_price: Optional[int] = None,
         max_price: Optional[int] = None,
-        max_pages: int = 3
-    ) -> Dict[str, Any]:
-        """Scrape products from Tayara using Playwright"""
+        max_pages: int = 3,
+        errors: Optional[List[Exception]] = None
+    ) -> AsyncIterator[List[Product]]:
+        """
+        Yield the products of each result page, in page order, as soon as it is scraped.
+        Pages that fail are skipped and their exceptions appended to `errors` when given.
+        """
         
-        all_products = []
-        current_page = 1
+        # Build URLs for every page up front, pagination is deterministic
+        urls = [
+            self.build_url(
+                query=query,
+                category=category,
+                subcategory=subcategory,
+                city=city,
+                condition=condition,
+                min_price=min_price,
+                max_price=max_price,
+                page=current_page
+            )
+            for current_page in range(1, max_pages + 1)
+        ]
+        
+        # Each page resolves its own future with either its products or the exception raised
+        loop = asyncio.get_running_loop()
+        results = [loop.create_future() for _ in urls]
+        
+        # Scrape the first page alone so its total ad count can cap the page range
+        try:
+            async with scrape_slot():
+                products_per_page, total = await self.scrape_products_per_page(urls[0])
+            results[0].set_result(products_per_page)
+            if total is not None:
+                page_count = max(1, math.ceil(total / self.PAGE_SIZE))
+                if page_count < len(urls):
+                    logger.info(f"{total} ads in total, scraping only {page_count} pages")
+                    del urls[page_count:]
+                    del results[page_count:]
+        except Exception as e:
+            results[0].set_result(e)
+        
+        # Scrape the remaining pages with a bounded number of concurrent workers.
+        # Each worker holds one scrape slot for its lifetime and only then checks
+        # out a pooled page, the same lock order as every other caller.
+        pending = iter(enumerate(urls[1:], start=1))
+        worker_count = min(self.PAGE_CONCURRENCY, len(urls) - 1)
+        live_workers = worker_count
         
-        while current_page <= max_pages:
+        async def worker():
+            nonlocal live_workers
             try:
-                # Build URL for current page
-                url = self.build_url(
-                    query=query,
-                    category=category,
-                    subcategory=subcategory,
-                    city=city,
-                    condition=condition,
-                    min_price=min_price,
-                    max_price=max_price,
-                    page=current_page
-                )
-                
-                logger.info(f"Scraping page {current_page}: {url}")
-                
-                products_per_page = await self.scrape_products_per_page(url)
+                async with scrape_slot(), AsyncExitStack() as stack:
+                    await scrape_pages(stack)
+            except Exception as e:
+                # Workers that got a slot drain the remaining pages, the last one
+                # to give up fails whatever is left so the consumer never hangs
+                live_workers -= 1
+                if live_workers == 0:
+                    for index, _ in pending:
+                        results[index].set_result(e)
+        
+        async def scrape_pages(stack: AsyncExitStack):
+            page_obj = None
+            
+            async def get_page():
+                # Check out one pooled page on first use and keep it for later pages
+                nonlocal page_obj
+                if page_obj is None:
+                    page_obj = await stack.enter_async_context(self.pool.page())
+                return page_obj
+            
+            for index, url in pending:
+                try:
+                    products_per_page, _ = await self.scrape_products_per_page(url, get_page)
+                    results[index].set_result(products_per_page)
+                except Exception as e:
+                    results[index].set_result(e)
+        
+        workers = [asyncio.create_task(worker()) for _ in range(worker_count)]
+        
+        try:
+            for current_page, result in enumerate(results, start=1):
+                products_per_page = await result
+                # Nothing was scraped, let the client retry later. A busy later page
+                # is just a failed page, the partial result is not cached.
+                if current_page == 1 and isinstance(products_per_page, ScraperBusyError):
+                    raise products_per_page
+                if isinstance(products_per_page, Exception):
+                    logger.error(f"Error scraping page {current_page}: {products_per_page}")
+                    if errors is not None:
+                        errors.append(products_per_page)
+                    continue
                 
                 # If no products found stop scraping
                 if not products_per_page:
                     logger.info(f"No products found on page {current_page}, stopping")
                     break
                 
-                all_products.extend(products_per_page)
-                logger.info(f"Total products so far: {len(all_products)}")
+                yield products_per_page
                 
-                if len(products_per_page) < 30:
+                if len(products_per_page) < self.PAGE_SIZE:
                     logger.info(f"Got only {len(products_per_page)} products on page {current_page}, might be last page")
                     break
-                
-                current_page += 1
-                
-                # small delay
-                await asyncio.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"Error scraping page {current_page}: {e}")
-                current_page += 1
-                continue
+        finally:
+            # Stop scraping pages past the last one
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+    
+    def extract_page_meta(self, total_text: Optional[str]) -> Optional[int]:
+        """Parse the total ad count out of the listing header text, if present"""
+        
+        if not total_text:
+            return None
+        
+        match = _TOTAL_COUNT_RE.search(total_text)
+        if not match:
+            return None
+        
+        digits = ''.join(ch for ch in match.group(1) if ch.isdigit())
+        return int(digits) if digits else None
+    
+    async def scrape_products(
+        self,
+        query: str,
+        category: str,
+        subcategory: str,
+        city: Optional[str] = None,
+        condition: Optional[str] = None,
+        min_price: Optional[int] = None,
+        max_price: Optional[int] = None,
+        max_pages: int = 3
+    ) -> Dict[str, Any]:
+        """Scrape products from Tayara using Playwright"""
+        
+        all_products = []
+        errors: List[Exception] = []
+        async for products_per_page in self.iter_product_pages(
+            query=query,
+            category=category,
+            subcategory=subcategory,
+            city=city,
+            condition=condition,
+            min_price=min_price,
+            max_price=max_price,
+            max_pages=max_pages,
+            errors=errors
+        ):
+            all_products.extend(products_per_page)
+            logger.info(f"Total products so far: {len(all_products)}")
         
         return {
             "success": True,
             "total_products": len(all_products),
-            "products": all_products
+            "products": all_products,
+            "failed_pages": len(errors)
         }
     
-    async def extract_product_info(self, element) -> Optional[Product]:
-        """Extract information from a single product element based on actual HTML structure"""
+    def extract_product_info(self, raw: Dict[str, Any]) -> Optional[Product]:
+        """Build a Product from a raw article record (see EXTRACT_PRODUCTS_JS)"""
         
         try:
-            # Extract title from h2 with class "card-title"
-            title_elem = await element.query_selector('h2.card-title')
-            title = await title_elem.inner_text() if title_elem else "No title"
+            title = raw.get('title') or "No title"
             
-            # Extract price from data element
-            price_elem = await element.query_selector('data')
+            # Prefer the price value attribute over the displayed text
             price = None
-            if price_elem:
-                # Get the value attribute and the text content
-                price_value = await price_elem.get_attribute('value')
-                price_text = await price_elem.inner_text()
-                if price_value:
-                    price = f"{price_value} DT"
-                elif price_text:
-                    price = price_text.strip()
-            
-            # Extract location and date from the location span
-            location_elem = await element.query_selector('svg[viewBox="0 0 20 20"] + span')
-            location_and_date = await location_elem.inner_text() if location_elem else None
+            if raw.get('priceVal'):
+                price = f"{raw['priceVal']} DT"
+            elif raw.get('priceTxt'):
+                price = raw['priceTxt'].strip()
             
-            location = None
-            date_posted = None
-            if location_and_date:
-                # Split by comma to separate location and date
-                parts = location_and_date.split(',')
-                if len(parts) >= 2:
-                    location = parts[0].strip()
-                    date_posted = parts[1].strip()
-                else:
-                    location = location_and_date.strip()
+            # Split by comma to separate location and date
+            loc, sep, date = (raw.get('loc') or '').partition(',')
+            location = loc.strip() or None
+            date_posted = date.strip() if sep else None
             
-            # Extract image URL
-            img_elem = await element.query_selector('img')
-            image_url = await img_elem.get_attribute('src') if img_elem else None
+            image_url = raw.get('img')
             
-            # Extract product URL from the link
-            link_elem = await element.query_selector('a')
-            relative_url = await link_elem.get_attribute('href') if link_elem else ""
+            # Make the product URL absolute
+            relative_url = raw.get('href') or ""
             product_url = f"https://www.tayara.tn{relative_url}" if relative_url and not relative_url.startswith('http') else relative_url
             
             # Clean and validate data
             if title and title.strip():
-                return Product(
+                return Product.model_construct(
                     title=title.strip(),
                     price=price,
                     location=location,
@@ -284,6 +643,37 @@ class TayaraScraper:
             logger.error(f"Error extracting product info: {e}")
             return None
         
+    def parse_product_node(self, node) -> Optional[Product]:
+        """Extract information from a single selectolax article node"""
+        
+        title_elem = node.css_first(SEL_TITLE)
+        price_elem = node.css_first(SEL_PRICE)
+        location_elem = node.css_first(SEL_LOC)
+        img_elem = node.css_first(SEL_IMG)
+        link_elem = node.css_first(SEL_LINK)
+        
+        return self.extract_product_info({
+            'title': title_elem.text() if title_elem else None,
+            'priceVal': price_elem.attributes.get('value') if price_elem else None,
+            'priceTxt': price_elem.text() if price_elem else None,
+            'loc': location_elem.text() if location_elem else None,
+            'img': img_elem.attributes.get('src') if img_elem else None,
+            'href': link_elem.attributes.get('href') if link_elem else None,
+        })
+    
+    def clean_description(self, full_text: Optional[str]) -> Optional[str]:
+        """Drop the phone number trailing a product description"""
+        
+        if full_text is None:
+            return None
+        
+        # Keep only the text before the phone number
+        head, sep, _ = full_text.partition('Tel:')
+        if sep:
+            # Remove extra whitespace and normalize line breaks
+            return ' '.join(head.split())
+        return full_text.strip()
+    
     async def get_product_page_info(self, url: str) -> Product:
         """
         Extract detailed product info from Tayara product URL
@@ -295,118 +685,72 @@ class TayaraScraper:
             Product: Product object with detailed information
         """
         
-        async with async_playwright() as p:
-            browser = await p.firefox.launch(headless=True)
-            
-            try:
-                context = await browser.new_context(
-                    # Use a more complete Firefox user agent
-                    user_agent='Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0',
-                    # Set viewport
-                    viewport={'width': 1920, 'height': 1080},
-                    # Set additional context options
-                    locale='fr-FR',
-                    timezone_id='Africa/Tunis',
-                    # Ignore HTTPS errors if any
-                    ignore_https_errors=True
-                )
-                
-                page = await context.new_page()
+        try:
+            async with scrape_slot(), self.pool.page() as page:
+                # Navigate to product page, returning as soon as the response arrives
+                await page.goto(url, wait_until='commit', timeout=30000)
                 
-                # Navigate to product page
-                await page.goto(url, wait_until='domcontentloaded', timeout=30000)
+                # Wait for the title, then for the whole document to be parsed so
+                # fields further down the page exist before extraction
+                await page.wait_for_selector(PRODUCT_PAGE_SELECTORS['title'], timeout=10000)
+                await page.wait_for_function(DOCUMENT_PARSED_JS, timeout=10000)
                 
-                # Wait for body content
-                await page.wait_for_selector('body', timeout=10000)
+                # Extract every field in a single round-trip
+                raw = await page.evaluate(EXTRACT_PRODUCT_PAGE_JS, PRODUCT_PAGE_SELECTORS)
                 
                 # Extract title
-                title = "No title"                
-                title_elem = await page.query_selector('li.p-2.my-1.text-xs.text-gray-600 span')
-                if title_elem:
-                    title_text = await title_elem.inner_text()
-                    if title_text and title_text.strip():
-                        title = title_text.strip()
+                title = "No title"
+                if raw.get('title') and raw['title'].strip():
+                    title = raw['title'].strip()
 
                 # Extract seller name
-                seller_name = None                
-                seller_elem = await page.query_selector('span.text-sm.font-semibold.text-gray-700.capitalize')
-                if seller_elem:
-                    seller_text = await seller_elem.inner_text()
-                    if seller_text and len(seller_text.strip()) > 0:
-                        seller_name = seller_text.strip()
+                seller_name = None
+                if raw.get('sellerName') and raw['sellerName'].strip():
+                    seller_name = raw['sellerName'].strip()
                 
                 # Extract price
                 price = None
-                price_elem = await page.query_selector('data')
-                if price_elem:
-                    price_value = await price_elem.get_attribute('value')
-                    if price_value:
-                        price = f"{price_value} DT"
-                    else:
-                        price_text = await price_elem.inner_text()
-                        price = price_text.strip() if price_text else None
+                if raw.get('priceVal'):
+                    price = f"{raw['priceVal']} DT"
+                elif raw.get('priceTxt'):
+                    price = raw['priceTxt'].strip()
 
                 # Extract description
-                    description_elem = await page.query_selector('p.text-sm.text-start.text-gray-700')
-                    if description_elem:
-                        full_text = await description_elem.text_content()
-                        
-                        match = re.search(r'^(.*?)Tel:', full_text, re.DOTALL)
-                        if match:
-                            description = match.group(1).strip()
-                            # Remove extra whitespace and normalize line breaks
-                            description = re.sub(r'\s+', ' ', description)
-                        else:
-                            description = full_text.strip()
+                description = self.clean_description(raw.get('description'))
 
                 # Extract location and date
-                location = None
-                date_posted = None
-                location_elem = await page.query_selector('div.flex.items-center.space-x-2.mb-1 span')
-                if location_elem:
-                    text = await location_elem.text_content()
-                    if text:
-                        text_elems = text.split(',')
-                        location = text_elems[0].strip()
-                        date_posted = text_elems[1].strip()
-
+                loc, sep, date = (raw.get('location') or '').partition(',')
+                location = loc.strip() or None
+                date_posted = date.strip() if sep else None
 
                 # Extract delivery status
                 is_delivery = False
-                container = await page.query_selector('span.flex.flex-col.py-1')
-
-                if container:
-                    status_elem = await container.query_selector('span:nth-child(2)')
-                    if status_elem:
-                        status_text = await status_elem.text_content()
-                        if status_text:
-                            status_text = status_text.strip().lower()
-                            is_delivery = status_text == 'oui'
-
-                # Extract contact
-                seller_contact = None
-                try:
-                    buttons = await page.query_selector_all('button[aria-label="Afficher numéro"]')
-                    if buttons:
-                        phone_button = buttons[1]
-                        await phone_button.click()
-                        # Wait for the phone number
-                        seller_contact_elem = await page.wait_for_selector('a[href^="tel:"]', timeout=5000)
-                        
-                        if seller_contact_elem:
-                            seller_contact = await seller_contact_elem.text_content()
-                            if seller_contact:
-                                seller_contact = seller_contact[4:].strip()
-                except Exception as e:
-                    logger.warning(f"Could not extract contact info: {e}")
-                
-                # Extract image URL
-                image_url = None
-                img_elem = await page.query_selector('img')
-                if img_elem:
-                    image_url = await img_elem.get_attribute('src')
+                status_text = raw.get('isDelivery')
+                if status_text:
+                    is_delivery = status_text.strip().lower() == 'oui'
+
+                # Extract contact, skipping the click flow when already known
+                seller_contact = _CONTACT_CACHE.get(url)
+                if seller_contact is None:
+                    try:
+                        buttons = await page.query_selector_all(SEL_PHONE_BUTTON)
+                        if buttons:
+                            phone_button = buttons[1]
+                            await phone_button.click()
+                            # Wait for the phone number
+                            seller_contact_elem = await page.wait_for_selector(SEL_PHONE_LINK, timeout=5000)
+                            
+                            if seller_contact_elem:
+                                seller_contact = await seller_contact_elem.text_content()
+                                if seller_contact:
+                                    seller_contact = seller_contact[4:].strip()
+                    except Exception as e:
+                        logger.warning(f"Could not extract contact info: {e}")
+                    
+                    if seller_contact:
+                        _CONTACT_CACHE[url] = seller_contact
                 
-                return Product(
+                return Product.model_construct(
                     title=title,
                     seller_name=seller_name,
                     seller_contact=seller_contact,
@@ -415,19 +759,56 @@ class TayaraScraper:
                     price=price,
                     location=location,
                     description=description,
-                    image_url=image_url,
                     product_url=url
                 )
                 
-            except Exception as e:
-                logger.error(f"Error extracting product info: {e}")
-                raise ValueError(f"Failed to extract product info: {str(e)}")
-            finally:
-                await browser.close()
+        except ScraperBusyError:
+            raise
+        except Exception as e:
+            logger.error(f"Error extracting product info: {e}")
+            raise ValueError(f"Failed to extract product info: {str(e)}")
 
 # Initialize scraper
 scraper = TayaraScraper()
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Keep one Playwright driver, browser, context pool and HTTP client alive for the app's lifetime"""
+    # Everything started is closed in reverse order, even if a later step or another close fails
+    async with AsyncExitStack() as stack:
+        app.state.playwright = await async_playwright().start()
+        stack.push_async_callback(app.state.playwright.stop)
+        app.state.browser = await app.state.playwright.chromium.launch(headless=True, args=BROWSER_ARGS)
+        stack.push_async_callback(app.state.browser.close)
+        # One context per scrape slot, slot holders never wait on the pool
+        app.state.context_pool = ContextPool(app.state.browser, size=SCRAPE_CONCURRENCY)
+        stack.push_async_callback(app.state.context_pool.close)
+        await app.state.context_pool.start()
+        # Single long-lived HTTP client for the server-rendered fast path, so every
+        # request reuses pooled HTTP/2 connections to tayara.tn
+        app.state.http_client = await stack.enter_async_context(httpx.AsyncClient(
+            http2=True,
+            headers=UA_HEADERS,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+            timeout=20,
+            follow_redirects=True,
+        ))
+        scraper.pool = app.state.context_pool
+        scraper.http_client = app.state.http_client
+        
+        yield
+        
+        scraper.pool = None
+        scraper.http_client = None
+
+# Endpoints return their response models and keep the default response class:
+# FastAPI >= 0.130 then serializes them straight to JSON bytes in pydantic-core
+app = FastAPI(
+    title="Tayara Scraper API",
+    version="1.0.0",
+    lifespan=lifespan,
+)
+
 @app.get("/")
 async def root():
     """API root endpoint"""
@@ -436,6 +817,7 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/search": "Search products on Tayara.tn",
+            "/search/stream": "Stream search results as Server-Sent Events",
             "/product": "Get detailed product information from URL",
             "/docs": "API documentation"
         }
@@ -443,6 +825,7 @@ async def root():
 
 @app.get("/search", response_model=SearchResponse)
 async def search_products(
+    response: Response,
     query: str = Query(..., description="Product name/model (e.g., 'Samsung S20')"),
     category: str = Query(..., description="Product category (e.g., 'Informatique et Multimedias')"),
     subcategory: str = Query(..., description="Product subcategory (e.g., 'Téléphones')"),
@@ -464,6 +847,25 @@ async def search_products(
         if min_price is not None and max_price is not None and min_price > max_price:
             raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price")
         
+        # Serve identical queries from the cache
+        cache_key = (
+            TayaraScraper.build_url(
+                query=query,
+                category=category,
+                subcategory=subcategory,
+                city=city,
+                condition=status,
+                min_price=min_price,
+                max_price=max_price,
+                page=None
+            ),
+            max_pages
+        )
+        cached = _SEARCH_CACHE.get(cache_key)
+        if cached is not None:
+            response.headers["Cache-Control"] = CACHE_CONTROL
+            return cached
+        
         # Perform scraping
         result = await scraper.scrape_products(
             query=query,
@@ -476,10 +878,20 @@ async def search_products(
             max_pages=max_pages
         )
         
-        return SearchResponse(**result)
+        search_response = SearchResponse(**result)
+        
+        # Don't cache results with gaps left by failed pages
+        if result["failed_pages"]:
+            return search_response
+        
+        _SEARCH_CACHE[cache_key] = search_response
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return search_response
         
     except HTTPException:
         raise
+    except ScraperBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         logger.error(f"Search error: {e}")
         return SearchResponse(
@@ -489,8 +901,71 @@ async def search_products(
             error=str(e)
         )
 
+@app.get("/search/stream")
+async def search_products_stream(
+    query: str = Query(..., description="Product name/model (e.g., 'Samsung S20')"),
+    category: str = Query(..., description="Product category (e.g., 'Informatique et Multimedias')"),
+    subcategory: str = Query(..., description="Product subcategory (e.g., 'Téléphones')"),
+    city: Optional[str] = Query(None, description="City/Location (e.g., 'Ariana')"),
+    status: Optional[str] = Query(None, description="Product condition: 'Neuf', 'Occasion'"),
+    min_price: Optional[int] = Query(None, ge=0, description="Minimum price in DT"),
+    max_price: Optional[int] = Query(None, ge=0, description="Maximum price in DT"),
+    max_pages: int = Query(3, ge=1, le=50, description="Maximum pages to scrape")
+):
+    """
+    Stream search results as Server-Sent Events, one `data:` event per product
+    as soon as its page is scraped, followed by an `end` event with the totals
+    
+    Example usage:
+    - /search/stream?query=iPhone&category=Informatique%20et%20Multimedias&subcategory=Téléphones&max_pages=2
+    """
+    
+    # Validate price range
+    if min_price is not None and max_price is not None and min_price > max_price:
+        raise HTTPException(status_code=400, detail="min_price cannot be greater than max_price")
+    
+    errors: List[Exception] = []
+    pages = scraper.iter_product_pages(
+        query=query,
+        category=category,
+        subcategory=subcategory,
+        city=city,
+        condition=status,
+        min_price=min_price,
+        max_price=max_price,
+        max_pages=max_pages,
+        errors=errors
+    )
+    
+    # Scrape the first page before answering, so a saturated scraper still gets a 503
+    try:
+        first_page = await anext(pages, [])
+    except ScraperBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    async def event_stream():
+        total_products = 0
+        try:
+            products_per_page = first_page
+            while products_per_page:
+                for product in products_per_page:
+                    yield f"data: {product.model_dump_json()}\n\n"
+                total_products += len(products_per_page)
+                products_per_page = await anext(pages, [])
+        except Exception as e:
+            logger.error(f"Search stream error: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+            return
+        finally:
+            await pages.aclose()
+        
+        yield f"event: end\ndata: {json.dumps({'total_products': total_products, 'failed_pages': len(errors)})}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers=SSE_HEADERS)
+
 @app.get("/product", response_model=ProductResponse)
 async def get_product_info(
+    response: Response,
     url: str = Query(..., description="Full URL of the product page on Tayara.tn")
 ):
     """
@@ -505,16 +980,27 @@ async def get_product_info(
         if not url.startswith('https://www.tayara.tn/'):
             raise HTTPException(status_code=400, detail="URL must be a valid Tayara.tn product URL")
         
+        # Serve recently scraped products from the cache
+        cached = _PRODUCT_CACHE.get(url)
+        if cached is not None:
+            response.headers["Cache-Control"] = CACHE_CONTROL
+            return cached
+        
         # Extract product information
         product = await scraper.get_product_page_info(url)
         
-        return ProductResponse(
+        product_response = ProductResponse(
             success=True,
             product=product
         )
+        _PRODUCT_CACHE[url] = product_response
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        return product_response
         
     except HTTPException:
         raise
+    except ScraperBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except ValueError as e:
         return ProductResponse(
             success=False,
@@ -551,4 +1037,13 @@ async def internal_error_handler(request, exc):
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Workers need an import string. Each worker runs its own browser, context pool,
+    # caches and SCRAPE_CONCURRENCY cap, so raise WEB_CONCURRENCY with care.
+    uvicorn.run(
+        "api:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "1")),
+    )
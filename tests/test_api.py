@@ -0,0 +1,381 @@
+import asyncio
+import contextlib
+import json
+import re
+
+import pytest
+from fastapi.testclient import TestClient
+from selectolax.lexbor import LexborHTMLParser
+
+import api
+
+
+@pytest.mark.parametrize("params, expected", [
+    (
+        dict(query="Samsung S20", category="Informatique et Multimedias", subcategory="Téléphones"),
+        "https://www.tayara.tn/ads/c/Informatique%20et%20Multimedias/T%C3%A9l%C3%A9phones/k/Samsung%20S20/?page=1",
+    ),
+    (
+        dict(query="iPhone", category="Informatique et Multimedias", subcategory="Téléphones", city="Tunis",
+             condition="Neuf", min_price=1000, max_price=5000, page=2),
+        "https://www.tayara.tn/ads/c/Informatique%20et%20Multimedias/T%C3%A9l%C3%A9phones/l/Tunis/t/Neuf/k/iPhone/"
+        "?minPrice=1000&maxPrice=5000&page=2",
+    ),
+    (
+        dict(query="vélo", category="Loisirs", city="Ariana", min_price=0, page=None),
+        "https://www.tayara.tn/ads/c/Loisirs/l/Ariana/k/v%C3%A9lo/?minPrice=0",
+    ),
+    (
+        dict(query="", category="Véhicules", subcategory="Voitures", max_price=20000, page=0),
+        "https://www.tayara.tn/ads/c/V%C3%A9hicules/Voitures/?maxPrice=20000",
+    ),
+])
+def test_build_url(params, expected):
+    # Expected URLs are the output of the original string concatenation version
+    assert api.TayaraScraper.build_url(**params) == expected
+
+
+CARD = """
+<article>
+    <a href="/item/123/samsung-s20/">
+        <img src="https://cdn.tayara.tn/s20.jpg">
+        <h2 class="card-title"> Samsung S20 </h2>
+        <data value="1200">1 200 DT</data>
+        <svg viewBox="0 0 20 20"></svg><span>Ariana, il y a 2 heures</span>
+    </a>
+</article>
+"""
+
+
+def parse_card(html):
+    return api.TayaraScraper().parse_product_node(LexborHTMLParser(html).css_first('article'))
+
+
+def test_parse_product_node():
+    product = parse_card(CARD)
+    assert product.title == "Samsung S20"
+    assert product.price == "1200 DT"
+    assert product.location == "Ariana"
+    assert product.date_posted == "il y a 2 heures"
+    assert product.image_url == "https://cdn.tayara.tn/s20.jpg"
+    assert product.product_url == "https://www.tayara.tn/item/123/samsung-s20/"
+
+
+def test_parse_product_node_without_date_or_price_value():
+    product = parse_card(CARD.replace("Ariana, il y a 2 heures", "Ariana").replace(' value="1200"', ''))
+    assert product.location == "Ariana"
+    assert product.date_posted is None
+    assert product.price == "1 200 DT"
+
+
+def test_parse_product_node_without_title():
+    product = parse_card('<article><a href="/item/1/"></a></article>')
+    assert product.title == "No title"
+    assert product.location is None
+
+
+def test_extract_product_info_from_browser_record():
+    product = api.TayaraScraper().extract_product_info({
+        'title': 'iPhone 12\n',
+        'priceVal': None,
+        'priceTxt': ' 1 500 DT ',
+        'loc': 'Sfax, hier',
+        'img': None,
+        'href': 'https://www.tayara.tn/item/9/',
+    })
+    assert product.title == "iPhone 12"
+    assert product.price == "1 500 DT"
+    assert (product.location, product.date_posted) == ("Sfax", "hier")
+    assert product.product_url == "https://www.tayara.tn/item/9/"
+
+
+def test_extract_product_info_location_without_date():
+    product = api.TayaraScraper().extract_product_info({'title': 'iPhone 12', 'loc': ' Sfax '})
+    assert (product.location, product.date_posted) == ("Sfax", None)
+
+
+class FakeDetailPage:
+    def __init__(self, raw):
+        self.raw = raw
+    
+    async def goto(self, url, **options):
+        pass
+    
+    async def wait_for_selector(self, selector, **options):
+        pass
+    
+    async def wait_for_function(self, expression, **options):
+        pass
+    
+    async def evaluate(self, expression, arg=None):
+        return self.raw
+    
+    async def query_selector_all(self, selector):
+        return []
+
+
+class FakeDetailPool:
+    def __init__(self, raw):
+        self.raw = raw
+    
+    @contextlib.asynccontextmanager
+    async def page(self):
+        yield FakeDetailPage(self.raw)
+
+
+def test_get_product_page_info_location_without_date():
+    scraper = api.TayaraScraper()
+    scraper.pool = FakeDetailPool({'title': 'iPhone 12', 'location': 'Sfax'})
+    product = asyncio.run(scraper.get_product_page_info("https://www.tayara.tn/item/9/"))
+    assert (product.location, product.date_posted) == ("Sfax", None)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("Très bon état,\n  jamais réparé  Tel: 22 123 456", "Très bon état, jamais réparé"),
+    ("Tel: 22 123 456", ""),
+    ("  Très bon état\n", "Très bon état"),
+    (None, None),
+])
+def test_clean_description(text, expected):
+    assert api.TayaraScraper().clean_description(text) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("1234 annonces", 1234),
+    ("12345 annonces", 12345),
+    ("1 234 annonces", 1234),
+    ("1\xa0234 résultats", 1234),
+    ("45 annonces", 45),
+    ("Samsung S20 2 annonces", 2),
+    ("Téléphones", None),
+    (None, None),
+])
+def test_extract_page_meta(text, expected):
+    assert api.TayaraScraper().extract_page_meta(text) == expected
+
+
+class FakeRoute:
+    def __init__(self, resource_type, url):
+        self.request = type("Request", (), {"resource_type": resource_type, "url": url})()
+        self.outcome = None
+    
+    async def abort(self):
+        self.outcome = "abort"
+    
+    async def continue_(self):
+        self.outcome = "continue"
+
+
+@pytest.mark.parametrize("resource_type, url, outcome", [
+    ("document", "https://www.tayara.tn/ads/k/analytics/", "continue"),
+    ("script", "https://www.tayara.tn/_next/static/analytics-chunk.js", "continue"),
+    ("script", "https://www.googletagmanager.com/gtm.js", "abort"),
+    ("xhr", "https://analytics.example.com/collect", "abort"),
+    ("stylesheet", "https://www.tayara.tn/styles.css", "abort"),
+    ("image", "https://cdn.tayara.tn/s20.jpg", "abort"),
+])
+def test_block_unneeded_resources(resource_type, url, outcome):
+    route = FakeRoute(resource_type, url)
+    asyncio.run(api.block_unneeded_resources(route))
+    assert route.outcome == outcome
+
+
+def stub_scraper(pages, total=None):
+    """
+    Scraper whose page N has pages[N-1] products, or raises pages[N-1] if it is an exception.
+    Every page reports `total` as the total ad count.
+    """
+    scraper = api.TayaraScraper()
+    scraper.scraped = []
+    
+    async def scrape_products_per_page(url, get_page=None):
+        number = int(re.search(r'page=(\d+)', url).group(1))
+        scraper.scraped.append(number)
+        result = pages[number - 1]
+        if isinstance(result, Exception):
+            raise result
+        return [api.Product(title=f"{number}-{i}", product_url=url) for i in range(result)], total
+    
+    scraper.scrape_products_per_page = scrape_products_per_page
+    return scraper
+
+
+def scrape(scraper, max_pages):
+    return asyncio.run(scraper.scrape_products(
+        query="s20", category="Informatique", subcategory="Téléphones", max_pages=max_pages
+    ))
+
+
+def test_scrape_products_stops_at_short_page():
+    result = scrape(stub_scraper([30, 10, 30]), max_pages=3)
+    assert result["total_products"] == 40
+    assert [p.title for p in result["products"]][29:31] == ["1-29", "2-0"]
+
+
+def test_scrape_products_stops_at_empty_page():
+    result = scrape(stub_scraper([30, 0, 30]), max_pages=3)
+    assert result["total_products"] == 30
+
+
+def test_scrape_products_skips_failed_pages():
+    result = scrape(stub_scraper([30, ValueError("boom"), 5]), max_pages=3)
+    assert result["total_products"] == 35
+    assert result["failed_pages"] == 1
+
+
+def test_scrape_products_ignores_failures_past_the_last_page():
+    result = scrape(stub_scraper([30, 3, ValueError("boom")]), max_pages=3)
+    assert result["failed_pages"] == 0
+
+
+def test_scrape_products_caps_pages_at_total_count():
+    scraper = stub_scraper([30, 30, 30, 30, 30], total=40)
+    result = scrape(scraper, max_pages=5)
+    assert sorted(scraper.scraped) == [1, 2]
+    assert result["total_products"] == 60
+
+
+def test_scrape_products_busy_when_no_slot_frees_up(monkeypatch):
+    monkeypatch.setattr(api, "SCRAPE_QUEUE_TIMEOUT", 0.01)
+    monkeypatch.setattr(api, "_SEM", asyncio.Semaphore(0))
+    with pytest.raises(api.ScraperBusyError):
+        scrape(stub_scraper([30, 30, 30]), max_pages=3)
+
+
+def test_scrape_products_busy_first_page_raises():
+    with pytest.raises(api.ScraperBusyError):
+        scrape(stub_scraper([api.ScraperBusyError("busy"), 30]), max_pages=2)
+
+
+def test_scrape_products_busy_later_page_is_a_failed_page():
+    result = scrape(stub_scraper([30, api.ScraperBusyError("busy"), 30]), max_pages=3)
+    assert result["total_products"] == 60
+    assert result["failed_pages"] == 1
+
+
+STREAM_URL = "/search/stream?query=s20&category=Informatique&subcategory=T%C3%A9l%C3%A9phones&max_pages=3"
+
+
+def test_search_stream(monkeypatch):
+    monkeypatch.setattr(api, "scraper", stub_scraper([30, ValueError("boom"), 2]))
+    response = TestClient(api.app).get(STREAM_URL)
+    
+    assert response.status_code == 200
+    assert response.headers["cache-control"] == "no-cache"
+    assert response.headers["x-accel-buffering"] == "no"
+    events = response.text.strip().split("\n\n")
+    assert len(events) == 33
+    assert json.loads(events[0].removeprefix("data: "))["title"] == "1-0"
+    assert events[-1] == 'event: end\ndata: {"total_products": 32, "failed_pages": 1}'
+
+
+def test_search_stream_busy(monkeypatch):
+    monkeypatch.setattr(api, "scraper", stub_scraper([api.ScraperBusyError("busy"), 30, 30]))
+    assert TestClient(api.app).get(STREAM_URL).status_code == 503
+
+
+class FakePage:
+    async def close(self):
+        pass
+
+
+class FakeContext:
+    def set_default_timeout(self, timeout):
+        pass
+    
+    async def route(self, pattern, handler):
+        pass
+    
+    async def new_page(self):
+        return FakePage()
+    
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    def __init__(self, close_error=None):
+        self.close_error = close_error
+        self.new_context_error = None
+    
+    async def new_context(self, **options):
+        if self.new_context_error:
+            raise self.new_context_error
+        return FakeContext()
+    
+    async def close(self):
+        if self.close_error:
+            raise self.close_error
+
+
+class FakePlaywright:
+    def __init__(self, browser):
+        self.browser = browser
+        self.stopped = 0
+        self.firefox = self.chromium = self
+    
+    async def start(self):
+        return self
+    
+    async def launch(self, **options):
+        return self.browser
+    
+    async def stop(self):
+        self.stopped += 1
+
+
+def test_lifespan_can_run_twice(monkeypatch):
+    playwright = FakePlaywright(FakeBrowser())
+    monkeypatch.setattr(api, "async_playwright", lambda: playwright)
+    
+    for _ in range(2):
+        with TestClient(api.app) as client:
+            assert client.get("/health").status_code == 200
+            assert not api.scraper.http_client.is_closed
+        assert api.scraper.http_client is None
+    assert playwright.stopped == 2
+
+
+def test_lifespan_closes_everything_when_one_close_fails(monkeypatch):
+    playwright = FakePlaywright(FakeBrowser(close_error=RuntimeError("browser crashed")))
+    monkeypatch.setattr(api, "async_playwright", lambda: playwright)
+    
+    with pytest.raises(RuntimeError, match="browser crashed"):
+        with TestClient(api.app):
+            http_client = api.app.state.http_client
+    assert playwright.stopped == 1
+    assert http_client.is_closed
+
+
+def test_context_pool_busy_without_leaking_contexts(monkeypatch):
+    monkeypatch.setattr(api, "SCRAPE_QUEUE_TIMEOUT", 0.01)
+    
+    async def checkout_twice():
+        pool = api.ContextPool(FakeBrowser(), size=1)
+        await pool.start()
+        async with pool.page():
+            with pytest.raises(api.ScraperBusyError):
+                async with pool.page():
+                    pass
+        await asyncio.sleep(0)
+        return pool._queue.qsize()
+    
+    assert asyncio.run(checkout_twice()) == 1
+
+
+def test_context_pool_refills_contexts_that_failed_to_recycle():
+    browser = FakeBrowser()
+    
+    async def recycle_while_browser_fails():
+        pool = api.ContextPool(browser, size=1, max_uses=1)
+        await pool.start()
+        browser.new_context_error = RuntimeError("browser crashed")
+        async with pool.page():
+            pass
+        assert pool._queue.qsize() == 0
+        browser.new_context_error = None
+        async with pool.page():
+            pass
+        return pool._queue.qsize()
+    
+    assert asyncio.run(recycle_while_browser_fails()) == 1